@@ -255,7 +255,8 @@ class CloudPrintMgr(object):
     Args:
       printer_name: string, name (or partial unique name) of printer.
     Returns:
-      boolean: True = in error state, False = not in error state.
+      boolean: True = in error state, False = not in error state,
+               None = printer could not be selected.
     """
     if self.SelectPrinter(printer_name):
       selected = self.cd.FindClass('cp-dashboard-listitem-selected')
@@ -263,12 +264,13 @@ class CloudPrintMgr(object):
         error_state = self.cd.FindClass('cp-error-state-icon', obj=selected)
         if error_state:
           return True
+        return False
       else:
         self.logger.error('%s not selected.', printer_name)
     else:
-      self.logger.error('Error finding and seleecting %s', printer_name)
+      self.logger.error('Error finding and selecting %s', printer_name)
 
-    return False
+    return None
 
   def GetPrinterWarningState(self, printer_name):
     """Determine if cp-warning-state-icon is present.
@@ -276,7 +278,8 @@ class CloudPrintMgr(object):
     Args:
       printer_name: string, name (or partial unique name) of printer.
     Returns:
-      boolean: True = in warning state, False = not in warning state.
+      boolean: True = in warning state, False = not in warning state,
+               None = printer could not be selected.
     """
     if self.SelectPrinter(printer_name):
       selected = self.cd.FindClass('cp-dashboard-listitem-selected')
@@ -284,12 +287,13 @@ class CloudPrintMgr(object):
         warning_state = self.cd.FindClass('cp-warning-state-icon', obj=selected)
         if warning_state:
           return True
+        return False
       else:
         self.logger.error('%s not selected.', printer_name)
     else:
-      self.logger.error('Error finding and seleecting %s', printer_name)
+      self.logger.error('Error finding and selecting %s', printer_name)
 
-    return False
+    return None
 
   def GetPrinterStateMessages(self, printer_name):
     """Get all of the printer detailed messages.
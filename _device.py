@@ -20,19 +20,35 @@ attributes of a device. Before the device attributes are fully populated,
 the methods GetDeviceDetails and GetDeviceCDD must be run.
 """
 
-import json
+import logging
+import time
 
 from _cloudprintmgr import CloudPrintMgr
 from _common import Extract
 from _config import Constants
+from _jsonparser import json_loads
 from _jsonparser import JsonParser
 from _privet import Privet
 from _transport import Transport
 
+# Privet info rarely changes during a run, so responses are cached per device
+# for this many seconds. Keys are (ipv4, port), values are
+# (timestamp, privet_info, headers).
+PRIVET_INFO_TTL = 60
+_privet_info_cache = {}
+
 
 class Device(object):
   """The basic device object."""
 
+  __slots__ = ('model', 'logger', 'cd', '_cloudprintmgr', 'ipv4', 'port',
+               'name', 'status', 'messages', 'details', 'error_state',
+               'warning_state', 'cdd', 'info', 'url', '_transport', '_jparser',
+               '_headers', 'privet', 'privet_url', '_privet_info',
+               'claim_token',
+               'automated_claim_url', 'claim_url', 'id', '_url_info',
+               '_url_cancel', '_url_start', '_url_claim', '_url_complete')
+
   def __init__(self, logger, chromedriver, model=None, privet_port=None):
     """Initialize a device object.
 
@@ -48,7 +64,13 @@ class Device(object):
       self.model = Constants.PRINTER['MODEL']
     self.logger = logger
     self.cd = chromedriver
-    self.cloudprintmgr = CloudPrintMgr(logger, chromedriver)
+    # The helpers below are built on first use, see the properties.
+    self._cloudprintmgr = None
+    self._transport = None
+    self._jparser = None
+    # Privet info (and the X-Privet-Token headers) is fetched on first use.
+    self._privet_info = None
+    self._headers = None
     self.ipv4 = Constants.PRINTER['IP']
     if privet_port:
       self.port = privet_port
@@ -62,29 +84,95 @@ class Device(object):
     self.warning_state = False
     self.cdd = {}
     self.info = None
+    self.claim_token = None
+    self.automated_claim_url = None
+    self.claim_url = None
+    self.id = None
 
-    self.url = 'http://%s:%s' % (self.ipv4, self.port)
+    self.url = ''.join(('http://', self.ipv4, ':', str(self.port)))
     self.logger.info('Device URL: %s', self.url)
-    self.transport = Transport(logger)
-    self.jparser = JsonParser(logger)
-    self.headers = None
     self.privet = Privet(logger)
-    self.privet_url = self.privet.SetPrivetUrls(self.ipv4, self.port)
-    self.GetPrivetInfo()
+    self.privet_url = self.privet.SetPrivetUrls(self.ipv4, self.port,
+                                                device_url=self.url)
+    register = self.privet_url['register']
+    self._url_info = self.privet_url['info']
+    self._url_cancel = register['cancel']
+    self._url_start = register['start']
+    self._url_claim = register['getClaimToken']
+    self._url_complete = register['complete']
+
+  @property
+  def cloudprintmgr(self):
+    """CloudPrintMgr object, created on first use."""
+    if self._cloudprintmgr is None:
+      self._cloudprintmgr = CloudPrintMgr(self.logger, self.cd)
+    return self._cloudprintmgr
+
+  @property
+  def transport(self):
+    """Transport object, created on first use."""
+    if self._transport is None:
+      self._transport = Transport(self.logger)
+    return self._transport
+
+  @property
+  def jparser(self):
+    """JsonParser object, created on first use."""
+    if self._jparser is None:
+      self._jparser = JsonParser(self.logger)
+    return self._jparser
+
+  @property
+  def privet_info(self):
+    """Privet info of the device, fetched on first use."""
+    if self._privet_info is None:
+      self.GetPrivetInfo(use_cache=True)
+    return self._privet_info
+
+  @privet_info.setter
+  def privet_info(self, value):
+    self._privet_info = value
+
+  @property
+  def headers(self):
+    """Privet token headers, fetched with the Privet info."""
+    if self._privet_info is None:
+      self.GetPrivetInfo(use_cache=True)
+    return self._headers
+
+  @headers.setter
+  def headers(self, value):
+    self._headers = value
+
+  def GetPrivetInfo(self, use_cache=False):
+    """Get the Privet info of the device.
+
+    Args:
+      use_cache: boolean, True = use a cached copy if it is still fresh,
+                 False = always query the device.
+    """
+    cached = _privet_info_cache.get((self.ipv4, self.port))
+    if use_cache and cached and time.time() - cached[0] < PRIVET_INFO_TTL:
+      self.privet_info = dict(cached[1])
+      self.headers = cached[2]
+      return
 
-  def GetPrivetInfo(self):
     self.privet_info = {}
-    response = self.transport.HTTPReq(self.privet_url['info'],
+    response = self.transport.HTTPReq(self._url_info,
                                       headers=self.privet.headers_empty)
     info = self.jparser.Read(response['data'])
     if info['json']:
-      for key in info:
-        self.privet_info[key] = info[key]
-        self.logger.debug('Privet Key: %s', key)
-        self.logger.debug('Value: %s', info[key])
-        self.logger.debug('--------------------------')
+      self.privet_info.update(info)
+      self.privet_info.pop('json', None)
+      if self.logger.isEnabledFor(logging.DEBUG):
+        for key, value in self.privet_info.items():
+          self.logger.debug('Privet Key: %s', key)
+          self.logger.debug('Value: %s', value)
+          self.logger.debug('--------------------------')
       if 'x-privet-token' in info:
         self.headers = {'X-Privet-Token': str(info['x-privet-token'])}
+      _privet_info_cache[(self.ipv4, self.port)] = (
+          time.time(), dict(self.privet_info), self.headers)
     else:
       if response['code']:
         self.logger.info('HTTP device return code: %s', response['code'])
@@ -95,6 +183,11 @@ class Device(object):
       if response['data']:
         self.logger.info('Data from response: %s', response['data'])
 
+  def InvalidatePrivetInfo(self):
+    """Drop the cached Privet info, as the registration state has changed."""
+    _privet_info_cache.pop((self.ipv4, self.port), None)
+    self._privet_info = None
+
   def GetDeviceDetails(self):
     """Get the device details from our management page.
 
@@ -104,6 +197,8 @@ class Device(object):
 
     RETRY_COUNT = 3
 
+    # The state getters return None when the printer could not be selected,
+    # and False only for a confirmed clean state.
     self.error_state = None
     self.warning_state = None
     self.status = None
@@ -112,9 +207,9 @@ class Device(object):
 
     for i in range(-1, RETRY_COUNT):
       self.cd.page_id = None
-      if not self.error_state:
+      if self.error_state is None:
         self.error_state = self.cloudprintmgr.GetPrinterErrorState(self.name)
-      if not self.warning_state:
+      if self.warning_state is None:
         self.warning_state = self.cloudprintmgr.GetPrinterWarningState(self.name)
       if not self.status:
         self.status = self.cloudprintmgr.GetPrinterState(self.name)
@@ -122,6 +217,10 @@ class Device(object):
         self.messages = self.cloudprintmgr.GetPrinterStateMessages(self.name)
       if not self.details:
         self.details = self.cloudprintmgr.GetPrinterDetails(self.name)
+      if (self.error_state is not None and
+          self.warning_state is not None and
+          all((self.status, self.messages, self.details))):
+        break
 
   def GetDeviceCDD(self, device_id):
     """Get device cdd and populate device object with the details.
@@ -157,21 +256,19 @@ class Device(object):
 
     cdd = {}
     if self.info:
-      cdd = json.loads(self.info)
+      cdd = json_loads(self.info)
     else:
       self.logger.warning('Device info is empty.')
       return False
     if 'printers' in cdd:
-      for k in cdd['printers'][0]:
-        if k == 'capabilities':
-          self.cdd['caps'] = {}
-        else:
-          self.cdd[k] = cdd['printers'][0][k]
+      printer = cdd['printers'][0]
+      for k, v in printer.iteritems():
+        if k != 'capabilities':
+          self.cdd[k] = v
     else:
       self.logger.error('Could not find printers in cdd.')
       return False
-    for k in cdd['printers'][0]['capabilities']['printer']:
-      self.cdd['caps'][k] = cdd['printers'][0]['capabilities']['printer'][k]
+    self.cdd['caps'] = dict(printer['capabilities']['printer'])
     return True
 
   def CancelRegistration(self):
@@ -180,10 +277,11 @@ class Device(object):
     Returns:
       return code from HTTP request.
     """
-    cancel_url = self.privet_url['register']['cancel']
     self.logger.debug('Sending request to cancel Privet Registration.')
-    response = self.transport.HTTPReq(cancel_url, data='',
+    response = self.transport.HTTPReq(self._url_cancel, data='',
                                       headers=self.headers, user=Constants.USER['EMAIL'])
+    if response['code'] == 200:
+      self.InvalidatePrivetInfo()
     return response['code']
 
   def StartPrivetRegister(self):
@@ -195,9 +293,12 @@ class Device(object):
 
     self.logger.debug('Registering device %s with Privet', self.ipv4)
     response = self.transport.HTTPReq(
-        self.privet_url['register']['start'], data='',
+        self._url_start, data='',
         headers=self.headers, user=Constants.USER['EMAIL'])
-    return self.transport.LogData(response)
+    result = self.transport.LogData(response)
+    if result:
+      self.InvalidatePrivetInfo()
+    return result
 
   def GetPrivetClaimToken(self):
     """Attempt to get a Privet Claim Token.
@@ -210,23 +311,27 @@ class Device(object):
     max_cycles = 5  # Don't loop more than this number of times.
     while counter < max_cycles:
       response = self.transport.HTTPReq(
-          self.privet_url['register']['getClaimToken'], data='',
+          self._url_claim, data='',
           headers=self.headers, user=Constants.USER['EMAIL'])
-      self.transport.LogData(response)
-      if 'token' in response['data']:
-        self.claim_token = self.jparser.GetValue(response['data'], key='token')
-        self.automated_claim_url = self.jparser.GetValue(
-            response['data'], key='automated_claim_url')
-        self.claim_url = self.jparser.GetValue(
-            response['data'], key='claim_url')
+      info = self.jparser.Read(response['data'])
+      self.transport.LogData(response, info=info)
+      if 'token' in info:
+        self.claim_token = info['token']
+        self.automated_claim_url = info.get('automated_claim_url')
+        self.claim_url = info.get('claim_url')
         return True
 
-      if 'error' in response['data']:
+      if 'error' in info:
         self.logger.warning(response['data'])
-        if 'pending_user_action' in response['data']:
+        if info['error'] == 'pending_user_action':
           counter += 1
+          # Back off exponentially while waiting on the user: 0.5s, 1s, 2s, 4s.
+          if counter < max_cycles:
+            time.sleep(0.5 * (2 ** (counter - 1)))
         else:
           return False
+      else:
+        return False
 
     return False  # If here, means unexpected condition, so return False.
 
@@ -249,8 +354,8 @@ class Device(object):
     response = self.transport.HTTPReq(self.automated_claim_url,
                                       auth_token=auth_token, data='',
                                       user=Constants.USER['EMAIL'])
-    self.transport.LogData(response)
     info = self.jparser.Read(response['data'])
+    self.transport.LogData(response, info=info)
     if info['json']:
       if info['success']:
         return True
@@ -268,16 +373,20 @@ class Device(object):
 
     self.logger.debug('Finishing printer registration.')
     response = self.transport.HTTPReq(
-        self.privet_url['register']['complete'], data='',
+        self._url_complete, data='',
         headers=self.headers, user=Constants.USER['EMAIL'])
     # Add the device id from the Cloud Print Service.
     info = self.jparser.Read(response['data'])
     if info['json']:
-      for k in info:
-        if 'device_id' in k:
-          self.id = info[k]
-          self.logger.debug('Registered with device id: %s', self.id)
-    return self.transport.LogData(response)
+      self.id = info.get('device_id') or info.get('deviceId')
+      if self.id:
+        self.logger.debug('Registered with device id: %s', self.id)
+      else:
+        self.logger.warning('No device id found in registration response.')
+    result = self.transport.LogData(response, info=info)
+    if result:
+      self.InvalidatePrivetInfo()
+    return result
 
   def UnRegister(self, auth_token):
     """Remove device from Google Cloud Service.
@@ -287,19 +396,19 @@ class Device(object):
     Returns:
       boolean: True = success, False = errors.
     """
-    if self.id:
-      delete_url = '%s/delete?printerid=%s' % (Constants.AUTH['URL']['GCP'],
-                                               self.id)
-      response = self.transport.HTTPReq(delete_url, auth_token=auth_token,
-                                        data='')
-    else:
+    if not self.id:
       self.logger.warning('Cannot delete device, not registered.')
       return False
 
-    result = self.jparser.Validate(response['data'])
+    delete_url = '%s/delete?printerid=%s' % (Constants.AUTH['URL']['GCP'],
+                                             self.id)
+    response = self.transport.HTTPReq(delete_url, auth_token=auth_token,
+                                      data='')
+    result = self.jparser.Validate(self.jparser.Read(response['data']))
     if result:
       self.logger.debug('Successfully deleted printer from service.')
       self.id = None
+      self.InvalidatePrivetInfo()
       return True
     else:
       self.logger.error('Unable to delete printer from service.')
@@ -323,7 +432,9 @@ class Device(object):
 
     info = self.jparser.Read(response['data'])
     Extract(info, self.info)
-    for k, v in self.info.iteritems():
-      self.logger.debug('%s: %s', k, v)
-      self.logger.debug('=============================================')
+    if self.logger.isEnabledFor(logging.DEBUG):
+      debug = self.logger.debug
+      for k, v in self.info.items():
+        debug('%s: %s', k, v)
+        debug('=============================================')
     return True
@@ -21,6 +21,12 @@ packaging up various artifacts into JSON formatted messages.
 
 import json
 
+try:
+  # ujson is an optional, C-accelerated drop in for json.loads.
+  from ujson import loads as json_loads
+except ImportError:
+  from json import loads as json_loads
+
 
 class JsonParser(object):
   """Various methods to parse JSON formatted messages."""
@@ -43,7 +49,7 @@ class JsonParser(object):
     """
     j = {}
     try:
-      j = json.loads(json_str)
+      j = json_loads(json_str)
       j['json'] = True
     except TypeError as e:
       self.logger.error('Error with json string %s\n%s', json_str, e)
@@ -93,10 +99,13 @@ class JsonParser(object):
     """Return boolean of what is found in response string.
 
     Args:
-      response: string, response from GCP service.
+      response: string, response from GCP service, or a dictionary already
+                returned by Read().
     Returns:
       boolean: True = success, False = not success.
     """
+    if isinstance(response, dict):
+      return response.get('success') is True
     if response.find('"success": true') > 0:
       return True
     else:
@@ -43,25 +43,29 @@ class Privet(object):
     self.headers_invalid = {'X-Privet-Token': 'INVALID'}
     self.headers_missing = {}
 
-  def SetPrivetUrls(self, device_ip, device_port):
+  def SetPrivetUrls(self, device_ip, device_port, device_url=None):
     """Construct a dictionary of URLs that Privet clients provide.
 
     Args:
       device_ip: string, IP address of the privet client.
       device_port: integer, TCP port number of device.
+      device_url: string, base url of the device, if already built.
     Returns:
       dictionary where key = action and value = URL.
     """
     urls = {}
     urls['register'] = {}  # Register has multiple actions.
-    device_url = 'http://%s:%d' % (device_ip, device_port)
+    if not device_url:
+      device_url = ''.join(('http://', device_ip, ':', str(device_port)))
+    privet_url = device_url + '/privet/'
+    printer_url = privet_url + 'printer/'
+    register_url = privet_url + 'register?action='
 
     for name in self.api_names:
-      urls[name] = '%s/privet/%s' % (device_url, name)
+      urls[name] = privet_url + name
     for name in self.printer_api:
-      urls[name] = '%s/privet/printer/%s' % (device_url, name)
+      urls[name] = printer_url + name
     for action in self.reg_actions:
-      urls['register'][action] = '%s/privet/%s?action=%s' % (
-          device_url, 'register', action)
+      urls['register'][action] = register_url + action
 
     return urls
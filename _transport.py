@@ -21,11 +21,15 @@ protocols like HTTP, mDNS, etc.
 This module is dependent on modules from the LogoCert pacakge.
 """
 
+import cookielib
 import mimetypes
 import os
 import socket  # In order to set a default timeout.
+import sys
 import urllib
-import urllib2
+
+import requests
+from requests.adapters import HTTPAdapter
 
 import _common
 from _config import Constants
@@ -44,6 +48,19 @@ class Transport(object):
     self.logger = logger
     self.jparser = JsonParser(logger)
     socket.setdefaulttimeout(Constants.URL['TIMEOUT'])
+    # Keep connections alive between requests, so each call to the device or
+    # service does not pay for a new TCP (and TLS) handshake.
+    self._session = requests.Session()
+    # Like urllib2, never store cookies between requests, and send the same
+    # default headers urllib2 did, so the device sees the same requests apart
+    # from the keep-alive connection.
+    self._session.cookies.set_policy(
+        cookielib.DefaultCookiePolicy(allowed_domains=[]))
+    self._session.headers = {'User-Agent': 'Python-urllib/%s' % sys.version[:3],
+                             'Accept-Encoding': 'identity'}
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    self._session.mount('http://', adapter)
+    self._session.mount('https://', adapter)
 
   def HTTPReq(self, url, auth_token=None, cloudprint=True, data=None,
               headers=None, printdata=None, user=None):
@@ -81,45 +98,56 @@ class Transport(object):
     self.logger.debug('Using headers: %s', headers)
     self.logger.debug('Accessing URL: %s', url)
 
-    request = urllib2.Request(self.url)
+    req_headers = {}
     if auth_token:
       self.logger.debug('Using Auth Token: %s', auth_token)
-      request.add_header('Authorization', 'GoogleLogin auth=%s' % auth_token)
+      req_headers['Authorization'] = 'GoogleLogin auth=%s' % auth_token
     if cloudprint:
-      request.add_header('X-CloudPrint-Proxy', 'GCPLogoCert')
+      req_headers['X-CloudPrint-Proxy'] = 'GCPLogoCert'
     if headers:
       for header in headers:
         self.logger.debug('Using header: %s:%s', header, headers[header])
-        request.add_header(header, headers[header])
+        req_headers[header] = headers[header]
+    body = None
     # If data = '', we want to execute a POST, so use: if data is not None.
     if data is not None:
-      edata = urllib.urlencode(data)
+      body = urllib.urlencode(data)
       self.logger.debug('Executing a HTTP POST request')
-      request.add_data(edata)
     else:
       self.logger.debug('Executing a HTTP Get request')
     if printdata is not None:
-      request.add_data(printdata)
+      body = printdata
       self.logger.debug('Adding print data.')
+    if body is not None:
+      method = 'POST'
+      req_headers.setdefault('Content-Type',
+                             'application/x-www-form-urlencoded')
+    else:
+      method = 'GET'
 
     try:
-      r = urllib2.urlopen(request)
-    except urllib2.URLError as e:  # This includes the HTTPError subclass.
-      if hasattr(e, 'code'):
-        response['code'] = e.code
-        self.logger.info('Return Code: %s', e.code)
-      if hasattr(e, 'reason'):
-        response['data'] = e.reason
-        self.logger.info(e.reason)
+      r = self._session.request(method, self.url, data=body,
+                                headers=req_headers,
+                                timeout=Constants.URL['TIMEOUT'])
+      r.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+      response['code'] = e.response.status_code
+      self.logger.info('Return Code: %s', e.response.status_code)
+      response['data'] = e.response.reason
+      self.logger.info(e.response.reason)
+      self.logger.debug(response)
+      return response
+    except requests.exceptions.RequestException as e:
+      response['data'] = str(e)
+      self.logger.info(e)
       self.logger.debug(response)
       return response
 
-    response['code'] = r.getcode()
-    response['headers'] = r.info()
-    response['data'] = r.read()
+    response['code'] = r.status_code
+    response['headers'] = r.headers
+    response['data'] = r.content
     self.LogData(response)
     self.logger.debug(response)
-    r.close()
 
     return response
 
@@ -144,30 +172,35 @@ class Transport(object):
 
     length = os.path.getsize(pathname)
     data = _common.ReadFile(pathname)
-    request = urllib2.Request(url, data)
+    req_headers = {}
     if headers:
       for header in headers:
         self.logger.debug('Using header: %s:%s', header, headers[header])
-        request.add_header(header, headers[header])
-    request.add_header('Cache-Control', 'no-cache')
-    request.add_header('Content-Length', '%d' % length)
-    request.add_header('Content-Type', content_type)
-    response = urllib2.urlopen(request).read().strip()
+        req_headers[header] = headers[header]
+    req_headers['Cache-Control'] = 'no-cache'
+    req_headers['Content-Length'] = '%d' % length
+    req_headers['Content-Type'] = content_type
+    r = self._session.post(url, data=data, headers=req_headers,
+                           timeout=Constants.URL['TIMEOUT'])
+    r.raise_for_status()
+    response = r.content.strip()
     self.LogData(response)
     return response
 
-  def LogData(self, response):
+  def LogData(self, response, info=None):
     """Log all response headers and data.
 
     Args:
       response: dictionary from a response from Distributer.SendHTTPReq().
+      info: dictionary of response data already returned by JsonParser.Read().
     Returns:
       boolean: True = return code is 200, False = return code is not 200.
     If this function is called and the log level is not debug, this method will
     only log the return code.
     """
 
-    info = self.jparser.Read(response['data'])
+    if info is None:
+      info = self.jparser.Read(response['data'])
     if info['json']:
       self.logger.debug(self.jparser.Print(info['json']))
       for k in info: